@@ -0,0 +1,107 @@
+# backend/app/batching.py
+"""
+Micro-batching for sklearn inference.
+
+sklearn's predict() has fixed Python/C-boundary overhead per call that
+dominates for single-row inputs. Under concurrent load we collect
+requests for up to a few milliseconds, stack them into one (B, 8)
+matrix, run a single predict() in a worker thread, and fan the results
+back out — so per-call overhead amortizes across the batch.
+
+Tunables (env):
+  NEUROFIT_MAX_BATCH    max rows per sklearn call (default 64;
+                        <=1 disables batching entirely)
+  NEUROFIT_MAX_WAIT_MS  max time the first request in a batch waits
+                        for company (default 2ms)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+MAX_BATCH = int(os.environ.get("NEUROFIT_MAX_BATCH", "64"))
+MAX_WAIT_MS = float(os.environ.get("NEUROFIT_MAX_WAIT_MS", "2"))
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prediction requests into one sklearn call.
+
+    Each caller awaits its own Future; a single worker task drains the
+    queue (up to max_batch rows or max_wait_ms, whichever first), runs
+    the batched predict in the default executor, and resolves the
+    Futures.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = MAX_WAIT_MS,
+    ):
+        self._predict_fn = predict_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.get_event_loop().create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def predict_one(self, row: np.ndarray) -> float:
+        """
+        Queue one feature row and await its prediction.
+        The row is copied, so callers may reuse their buffer.
+        """
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        await self._queue.put((np.array(row, dtype=float), fut))
+        return await fut
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            row, fut = await self._queue.get()
+            batch = [(row, fut)]
+
+            # wait briefly for more rows to amortize the sklearn call
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            X = np.vstack([r for r, _ in batch])
+            try:
+                preds = await loop.run_in_executor(None, self._predict_fn, X)
+                for (_, f), pred in zip(batch, preds):
+                    if not f.done():
+                        f.set_result(float(pred))
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
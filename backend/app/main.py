@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import json
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
 
 import numpy as np
-from fastapi import FastAPI
-from pydantic import BaseModel
+import orjson
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
+from .batching import MicroBatcher, MAX_BATCH
+from .fast_forest import FlatForest
+
 # ============================================================
 # Logging (stdout only — Render safe)
 # ============================================================
@@ -20,15 +30,59 @@ from starlette.staticfiles import StaticFiles
 logger = logging.getLogger("neurofit")
 logging.basicConfig(level=logging.INFO)
 
+# Timestamp formatting: datetime.utcnow().isoformat() allocates a
+# datetime and formats it in Python on every call. Cache the per-second
+# prefix and only append microseconds on repeat calls within a second.
+_iso_cache = {"sec": -1, "prefix": ""}
+
+def _iso_now() -> str:
+    t = time.time()
+    sec = int(t)
+    if sec != _iso_cache["sec"]:
+        _iso_cache["prefix"] = datetime.utcfromtimestamp(sec).isoformat()
+        _iso_cache["sec"] = sec
+    return f"{_iso_cache['prefix']}.{int((t - sec) * 1e6):06d}"
+
+# Prediction records are buffered and flushed off the request path by a
+# background task: one serialized write per flush instead of a
+# write+format on every prediction. deque(maxlen=...) drops the oldest
+# records if the flusher ever falls behind.
+PRED_LOG_FILE = Path(__file__).resolve().parent.parent / "data" / "predictions.log"
+_LOG_BUFFER: deque = deque(maxlen=10_000)
+_LOG_FLUSH_INTERVAL = 0.25  # seconds
+
 def log_prediction(payload: dict):
     """
-    Log one prediction as JSON to stdout.
-    Render captures this automatically.
+    Queue one prediction record. The background flusher emits it to
+    stdout (Render captures this) and appends it to PRED_LOG_FILE for
+    /stats and retraining.
     """
+    _LOG_BUFFER.append(payload)
+
+def _flush_log_buffer():
+    lines = []
+    while _LOG_BUFFER:
+        try:
+            lines.append(orjson.dumps(_LOG_BUFFER.popleft()))
+        except (IndexError, TypeError, ValueError):
+            continue
+    if not lines:
+        return
+    for line in lines:
+        logger.info(line.decode())
     try:
-        logger.info(json.dumps(payload))
-    except Exception:
-        pass
+        PRED_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(PRED_LOG_FILE, "ab") as f:
+            f.write(b"\n".join(lines) + b"\n")
+    except Exception as e:
+        logger.warning("Could not flush prediction log: %s", e)
+
+async def _log_flusher():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(_LOG_FLUSH_INTERVAL)
+        if _LOG_BUFFER:
+            await loop.run_in_executor(None, _flush_log_buffer)
 
 
 # ============================================================
@@ -44,10 +98,43 @@ _ml_model = None
 try:
     if MODEL_FILE.exists():
         import joblib
-        _ml_model = joblib.load(MODEL_FILE)
+        # mmap the (uncompressed) pickle so multi-worker deployments
+        # share the model's numpy buffers as read-only physical pages.
+        _ml_model = joblib.load(MODEL_FILE, mmap_mode="r")
 except Exception as e:
     logger.warning("Could not load ML model: %s", e)
 
+# Flattened-tree fast path (see fast_forest.py). None unless the loaded
+# model is a supported regression forest; sklearn predict otherwise.
+_fast_forest: Optional[FlatForest] = None
+if _ml_model is not None:
+    _fast_forest = FlatForest.from_estimator(_ml_model)
+
+# Micro-batcher: stacks concurrent predict requests into one sklearn
+# call (see batching.py). Disabled when no model is loaded or
+# NEUROFIT_MAX_BATCH <= 1.
+_batcher: Optional[MicroBatcher] = None
+if _ml_model is not None and MAX_BATCH > 1:
+    _batcher = MicroBatcher(_ml_model.predict)
+
+# Direct (unbatched) sklearn calls are CPU-bound: run them in the
+# threadpool, capped at NEUROFIT_THREADS concurrent inferences so a
+# burst can't occupy every worker thread.
+N_THREADS = int(os.environ.get("NEUROFIT_THREADS", os.cpu_count() or 1))
+_infer_semaphore = asyncio.Semaphore(N_THREADS)
+
+MANIFEST_FILE = MODEL_DIR / "model_manifest.json"
+
+# Manifest is read once at startup; endpoints hand the cached dict back
+# as-is, with no response-model revalidation in between.
+_model_manifest: Optional[dict] = None
+try:
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            _model_manifest = json.load(f)
+except Exception as e:
+    logger.warning("Could not load model manifest: %s", e)
+
 
 # ============================================================
 # Feature order (MUST match training)
@@ -64,74 +151,118 @@ FEATURE_ORDER = [
     "reaction_attempted",
 ]
 
+# Immutable copy for validation/static responses; the list above stays
+# for callers that index it.
+_EXPECTED_FEATURES = tuple(FEATURE_ORDER)
+
 
 # ============================================================
 # Data structures
 # ============================================================
 
-@dataclass
+@dataclass(slots=True)
 class TypingFeatures:
     average_latency_ms: float = 0.0
     total_duration_ms: float = 0.0
     backspace_rate: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class TaskPerformance:
     reaction_time_ms: Optional[float] = None
     reaction_attempted: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class SessionData:
     timestamp: str
     answers: Any
     typing_features: TypingFeatures = field(default_factory=TypingFeatures)
     task_performance: TaskPerformance = field(default_factory=TaskPerformance)
+    _answer_floats: Optional[tuple] = field(default=None, init=False, repr=False)
+
+    def answer_floats(self) -> tuple[float, float, float]:
+        """(sleep, energy, stress) floats, computed once and cached."""
+        if self._answer_floats is None:
+            self._answer_floats = _extract_answer_floats(self.answers)
+        return self._answer_floats
 
 
 # ============================================================
 # Feature extraction
 # ============================================================
 
-def answers_to_map(answers: Any) -> dict:
+def _extract_answer_floats(answers: Any) -> tuple[float, float, float]:
+    """
+    Pull (sleep_hours, energy_level, stress_level) straight out of the
+    answers payload. Dict answers are three O(1) gets; list answers are
+    resolved in a single pass into locals, with no intermediate dict.
+    """
     if isinstance(answers, dict):
-        return answers
+        return (
+            float(answers.get("sleep_hours", 0.0)),
+            float(answers.get("energy_level", 0.0)),
+            float(answers.get("stress_level", 0.0)),
+        )
 
-    out = {}
+    sleep = energy = stress = 0.0
     if isinstance(answers, list):
         for item in answers:
-            if isinstance(item, dict):
-                k = item.get("question_id")
-                v = item.get("value")
-                if k is not None:
-                    out[k] = v
-    return out
-
-
-def extract_features(session: SessionData) -> list[float]:
-    ans = answers_to_map(session.answers or {})
-
-    f = []
-    f.append(float(ans.get("sleep_hours", 0.0)))
-    f.append(float(ans.get("energy_level", 0.0)))
-    f.append(float(ans.get("stress_level", 0.0)))
+            if not isinstance(item, dict):
+                continue
+            k = item.get("question_id")
+            if k == "sleep_hours":
+                sleep = float(item.get("value", 0.0))
+            elif k == "energy_level":
+                energy = float(item.get("value", 0.0))
+            elif k == "stress_level":
+                stress = float(item.get("value", 0.0))
+    return sleep, energy, stress
+
+
+# One reusable (1, n_features) buffer per worker thread, so the hot path
+# never allocates a fresh array. float64 on purpose: the questionnaire
+# values must round-trip exactly into logs and the heuristic, and
+# sklearn's tree predict casts its input to its own internal dtype
+# regardless, so a float32 buffer would cost precision without saving
+# the copy.
+_feature_buf = threading.local()
+
+def _get_feature_buffer() -> np.ndarray:
+    buf = getattr(_feature_buf, "buf", None)
+    if buf is None:
+        buf = np.empty((1, len(FEATURE_ORDER)), dtype=float)
+        _feature_buf.buf = buf
+    return buf
+
+
+def extract_features(session: SessionData) -> np.ndarray:
+    """
+    Fill the thread-local feature buffer from a session.
+    Returns a (1, 8) float array in FEATURE_ORDER; the buffer is reused
+    across calls on the same thread, so copy before storing long-term.
+    """
+    buf = _get_feature_buffer()
+    row = buf[0]
+    row[0], row[1], row[2] = session.answer_floats()
 
+    # typing/task fields are floats by the time they get here (request
+    # models validate them); ndarray assignment coerces the scalar.
     tf = session.typing_features
-    f.append(float(tf.average_latency_ms))
-    f.append(float(tf.total_duration_ms))
-    f.append(float(tf.backspace_rate))
+    row[3] = tf.average_latency_ms
+    row[4] = tf.total_duration_ms
+    row[5] = tf.backspace_rate
 
     tp = session.task_performance
-    f.append(float(tp.reaction_time_ms or 0.0))
-    f.append(1.0 if tp.reaction_attempted else 0.0)
+    row[6] = tp.reaction_time_ms or 0.0
+    row[7] = 1.0 if tp.reaction_attempted else 0.0
 
-    return f
+    return buf
 
 
 # ============================================================
 # FastAPI app
 # ============================================================
 
-app = FastAPI(title="NeuroFit+")
+app = FastAPI(title="NeuroFit+", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -146,35 +277,83 @@ if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 
+_log_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def _start_background_tasks():
+    global _log_task
+    if _batcher is not None:
+        _batcher.start()
+    _log_task = asyncio.create_task(_log_flusher())
+
+@app.on_event("shutdown")
+async def _stop_background_tasks():
+    if _batcher is not None:
+        await _batcher.stop()
+    if _log_task is not None:
+        _log_task.cancel()
+        try:
+            await _log_task
+        except asyncio.CancelledError:
+            pass
+    _flush_log_buffer()  # drain whatever is left
+
+
 # ============================================================
 # Health & meta endpoints
 # ============================================================
 
+# Root and /model/features never change after import (the model loads at
+# module scope), so serialize them once and hand back the same bytes.
+_ROOT_BYTES = orjson.dumps({
+    "message": "NeuroFit+ root",
+    "model_status": {
+        "loaded": bool(_ml_model),
+        "path": str(MODEL_FILE),
+        "version": MODEL_VERSION
+    },
+    "endpoints": [
+        "/",
+        "/health",
+        "/model/features",
+        "/model/manifest",
+        "/stats",
+        "/predict_fatigue",
+        "/predict_fatigue/clear_cache",
+        "/save_session",
+    ],
+})
+
+_MODEL_FEATURES_BYTES = orjson.dumps({
+    "features": FEATURE_ORDER,
+    "expected_features": _EXPECTED_FEATURES,
+    "expected_feature_count": len(_EXPECTED_FEATURES),
+    "model_loaded": bool(_ml_model),
+})
+
+
 @app.get("/")
 def root():
-    return {
-        "message": "NeuroFit+ root",
-        "model_status": {
-            "loaded": bool(_ml_model),
-            "path": str(MODEL_FILE),
-            "version": MODEL_VERSION
-        },
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 def health():
     return {
         "status": "healthy",
-        "model_loaded": bool(_ml_model)
+        "model_loaded": bool(_ml_model),
+        "timestamp": _iso_now(),
     }
 
 @app.get("/model/features")
 def model_features():
-    return {
-        "features": FEATURE_ORDER,
-        "expected_features": len(FEATURE_ORDER),
-        "model_loaded": bool(_ml_model),
-    }
+    return Response(content=_MODEL_FEATURES_BYTES, media_type="application/json")
+
+@app.get("/model/manifest")
+def model_manifest():
+    if _model_manifest is None:
+        raise HTTPException(status_code=404, detail="Model manifest not found")
+    return _model_manifest
+
 @app.get("/stats")
 def stats():
     """
@@ -217,35 +396,174 @@ def stats():
         "average_fatigue": round(fatigue_sum / total, 3) if total else None,
         "last_prediction_at": last_ts,
     }
+
+# ============================================================
+# Risk mapping (precomputed)
+# ============================================================
+
+# Deterministic score -> (risk level, recommendations) mapping, built
+# once so the hot path does a single compare instead of rebuilding
+# strings/lists per request.
+_RISK_LOW = ("low", ("keep going",))
+_RISK_HIGH = ("high", ("rest",))
+
+# Heuristic fallback weights, folded into single multipliers at import.
+# Three multiply-adds over scalars — compiling this (Numba JIT or AOT)
+# buys nothing: the call itself is ~100ns and a compiled-extension
+# boundary crossing costs about as much as the arithmetic. The win was
+# hoisting it out of the handler so the closure isn't rebuilt per
+# request.
+_W_SLEEP = 0.6 / 9.0
+_W_STRESS = 0.3 / 10.0
+_W_LATENCY = 0.1 / 1000.0
+
+def heuristic_score(f) -> float:
+    """Weighted fallback score over (sleep, stress, latency), clamped to [0, 1]."""
+    score = 0.6 - f[0] * _W_SLEEP + f[2] * _W_STRESS + f[3] * _W_LATENCY
+    return max(0.0, min(1.0, score))
+
+def risk_and_recommendations(score: float) -> tuple[str, list[str]]:
+    risk, recs = _RISK_HIGH if score > 0.5 else _RISK_LOW
+    return risk, list(recs)
+
+
 # ============================================================
 # Request schemas
 # ============================================================
 
+# Request models are read-only snapshots of the wire payload: frozen
+# skips mutability bookkeeping, extras are dropped rather than tracked.
+# Handlers validate raw bytes via model_validate_json, which runs in
+# pydantic-core (Rust) — close enough to msgspec-class speed that a
+# second validation library isn't worth carrying. Because the handlers
+# take a raw Request, FastAPI can't infer the body schema; the routes
+# attach it explicitly via _PREDICT_REQUEST_DOC below so the OpenAPI
+# spec still documents the payload.
+_request_model_config = ConfigDict(extra="ignore", frozen=True)
+
 class TypingModel(BaseModel):
+    model_config = _request_model_config
+
     average_latency_ms: float
     total_duration_ms: float
     backspace_rate: float
 
 class TaskPerfModel(BaseModel):
+    model_config = _request_model_config
+
     reaction_time_ms: Optional[float]
     reaction_attempted: bool
 
 class PredictRequest(BaseModel):
+    model_config = _request_model_config
+
     timestamp: str
     answers: Any
     typing_features: TypingModel
     task_performance: TaskPerfModel
 
 
+# openapi_extra payload for routes that read the raw Request body: keeps
+# the request schema in the generated spec even though FastAPI never
+# sees a body parameter (nested models land in the schema's $defs).
+_PREDICT_REQUEST_DOC = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": PredictRequest.model_json_schema()}
+        },
+    }
+}
+
+
+# ============================================================
+# Prediction cache
+# ============================================================
+
+# Frontends re-submit identical payloads (retries, probes). Keyed on the
+# raw feature bytes — exact and cheaper than hashing 64 bytes — so
+# timestamp differences never thrash the cache. Only the ML path is
+# cached; the heuristic is already trivial.
+_PRED_CACHE_SIZE = 1024
+_pred_cache: OrderedDict[bytes, float] = OrderedDict()
+
+def _pred_cache_get(key: bytes) -> Optional[float]:
+    score = _pred_cache.get(key)
+    if score is not None:
+        _pred_cache.move_to_end(key)
+    return score
+
+def _pred_cache_put(key: bytes, score: float) -> None:
+    _pred_cache[key] = score
+    if len(_pred_cache) > _PRED_CACHE_SIZE:
+        _pred_cache.popitem(last=False)
+
+
+@app.post("/predict_fatigue/clear_cache")
+def clear_prediction_cache():
+    cleared = len(_pred_cache)
+    _pred_cache.clear()
+    return {"cleared": cleared}
+
+
+# ============================================================
+# Session persistence
+# ============================================================
+
+SESSIONS_FILE = Path(__file__).resolve().parent.parent / "data" / "sessions.jsonl"
+
+def _append_session_line(line: bytes):
+    try:
+        SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(SESSIONS_FILE, "ab") as f:
+            f.write(line)
+            f.write(b"\n")
+    except Exception as e:
+        logger.warning("Could not persist session: %s", e)
+
+
+@app.post("/save_session", openapi_extra=_PREDICT_REQUEST_DOC)
+async def save_session(request: Request, background_tasks: BackgroundTasks):
+    """
+    Persist one session as a JSONL line for later retraining.
+
+    The write happens in a background task after the response is sent,
+    so the event loop never blocks on disk I/O.
+    """
+    body = await request.body()
+    try:
+        req = PredictRequest.model_validate_json(body)
+    except ValidationError as e:
+        # include_input=False: for syntax errors the input echo is the
+        # raw bytes body, which the default handler can't serialize
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_url=False, include_input=False),
+        )
+
+    # model_dump_json runs pydantic-core's Rust serializer straight to a
+    # string — no intermediate dict, no stdlib json pass.
+    background_tasks.add_task(_append_session_line, req.model_dump_json().encode())
+
+    return {"status": "saved", "timestamp": _iso_now()}
+
+
 # ============================================================
 # Prediction endpoint (LOCKED)
+#
+# Responses are plain dicts on purpose: there is no Pydantic response
+# model here, so nothing is validated or constructed per response.
+# If a response schema is ever introduced, build it with
+# model_construct() — the values below are already clamped and typed.
 # ============================================================
 
-@app.post("/predict_fatigue")
-def predict_fatigue(req: PredictRequest):
+@app.post("/predict_fatigue", openapi_extra=_PREDICT_REQUEST_DOC)
+async def predict_fatigue(request: Request):
     """
     Production-safe prediction endpoint.
 
+    - Validates the raw body with `model_validate_json` (single parse,
+      no stdlib-json -> dict -> Pydantic round trip)
     - ML inference only (no training)
     - Normalized output [0,1]
     - Deterministic risk mapping
@@ -253,8 +571,29 @@ def predict_fatigue(req: PredictRequest):
     - Logs every prediction
     """
 
-    td = TypingFeatures(**req.typing_features.dict())
-    tp = TaskPerformance(**req.task_performance.dict())
+    body = await request.body()
+    try:
+        req = PredictRequest.model_validate_json(body)
+    except ValidationError as e:
+        # include_input=False: for syntax errors the input echo is the
+        # raw bytes body, which the default handler can't serialize
+        raise HTTPException(
+            status_code=422,
+            detail=e.errors(include_url=False, include_input=False),
+        )
+
+    # direct attribute copies — no model_dump dict round trip
+    tm = req.typing_features
+    td = TypingFeatures(
+        average_latency_ms=tm.average_latency_ms,
+        total_duration_ms=tm.total_duration_ms,
+        backspace_rate=tm.backspace_rate,
+    )
+    pm = req.task_performance
+    tp = TaskPerformance(
+        reaction_time_ms=pm.reaction_time_ms,
+        reaction_attempted=pm.reaction_attempted,
+    )
 
     session = SessionData(
         timestamp=req.timestamp,
@@ -263,31 +602,39 @@ def predict_fatigue(req: PredictRequest):
         task_performance=tp,
     )
 
-    features = extract_features(session)
-
-    def heuristic_score(f):
-        sleep = f[0]
-        stress = f[2]
-        latency = f[3]
-        score = (
-            (1.0 - sleep / 9.0) * 0.6 +
-            (stress / 10.0) * 0.3 +
-            (latency / 1000.0) * 0.1
-        )
-        return max(0.0, min(1.0, score))
+    X = extract_features(session)
+    features = X[0].tolist()
 
     # ---------------- ML PATH ----------------
     if _ml_model is not None:
         try:
-            X = np.array([features], dtype=float)
-            pred = float(_ml_model.predict(X)[0])
+            cache_key = X.tobytes()
+            cached = _pred_cache_get(cache_key)
+            if cached is not None:
+                pred = cached
+            elif _fast_forest is not None:
+                pred = _fast_forest.predict_one(features)
+            elif _batcher is not None and _batcher.running:
+                pred = await _batcher.predict_one(X[0])
+            else:
+                # copy before any await: the thread-local buffer is
+                # refilled by other requests on this loop, so snapshot
+                # it while we still hold this request's values (waiting
+                # on the semaphore already yields control)
+                X_copy = X.copy()
+                async with _infer_semaphore:
+                    preds = await asyncio.get_running_loop().run_in_executor(
+                        None, _ml_model.predict, X_copy
+                    )
+                pred = float(preds[0])
+            if cached is None:
+                _pred_cache_put(cache_key, pred)
             fatigue_score = max(0.0, min(1.0, pred))
 
-            risk = "high" if fatigue_score > 0.5 else "low"
-            recs = ["rest"] if risk == "high" else ["keep going"]
+            risk, recs = risk_and_recommendations(fatigue_score)
 
             log_prediction({
-                "ts": datetime.utcnow().isoformat(),
+                "ts": _iso_now(),
                 "features": features,
                 "fatigue_score": fatigue_score,
                 "risk_level": risk,
@@ -309,10 +656,10 @@ def predict_fatigue(req: PredictRequest):
 
     # ---------------- FALLBACK ----------------
     score = heuristic_score(features)
-    risk = "high" if score > 0.5 else "low"
+    risk, recs = risk_and_recommendations(score)
 
     log_prediction({
-        "ts": datetime.utcnow().isoformat(),
+        "ts": _iso_now(),
         "features": features,
         "fatigue_score": score,
         "risk_level": risk,
@@ -323,7 +670,7 @@ def predict_fatigue(req: PredictRequest):
     return {
         "fatigue_score": score,
         "risk_level": risk,
-        "recommendations": ["rest"] if risk == "high" else ["keep going"],
+        "recommendations": recs,
         "model_used": "heuristic",
         "model_type": "heuristic",
         "model_version": MODEL_VERSION
@@ -1,17 +1,30 @@
 # backend/app/workout_engine.py
-import json
+from bisect import bisect_left
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 BASE = Path(__file__).resolve().parent.parent
-WORKOUT_FILE = BASE / "data" / "workout_library.json"
 
-# Load library once at import
-if WORKOUT_FILE.exists():
-    with open(WORKOUT_FILE, "r", encoding="utf-8") as f:
-        WORKOUT_LIBRARY = json.load(f)
-else:
-    WORKOUT_LIBRARY = []
+# The library ships at the repo-level data/ directory; backend/data/ is
+# checked first so a deployment can override it.
+_WORKOUT_FILE_CANDIDATES = (
+    BASE / "data" / "workout_library.json",
+    BASE.parent / "data" / "workout_library.json",
+)
+WORKOUT_FILE = next(
+    (p for p in _WORKOUT_FILE_CANDIDATES if p.exists()),
+    _WORKOUT_FILE_CANDIDATES[0],
+)
+
+# Load library once at import — one read_bytes + one orjson parse
+WORKOUT_LIBRARY = _json_loads(WORKOUT_FILE.read_bytes()) if WORKOUT_FILE.exists() else []
 
 def compute_bmi(height_cm: Optional[float], weight_kg: Optional[float]) -> Optional[float]:
     try:
@@ -24,21 +37,70 @@ def compute_bmi(height_cm: Optional[float], weight_kg: Optional[float]) -> Optio
     except Exception:
         return None
 
+# Fatigue buckets: <=30 energizing, <=60 balanced, else restorative
+_CAT_THRESHOLDS = (30, 60)
+
 def _category_for_fatigue(score: float) -> str:
-    if score <= 30:
-        return "energizing"
-    if score <= 60:
-        return "balanced"
-    return "restorative"
+    return _CATEGORIES[bisect_left(_CAT_THRESHOLDS, score)]
+
+_DIFFICULTY_FACTORS = {"easy": 0.95, "medium": 1.0, "hard": 1.1}
 
 def _difficulty_factor(difficulty: str) -> float:
-    if difficulty == "easy":
-        return 0.95
-    if difficulty == "medium":
-        return 1.0
-    if difficulty == "hard":
-        return 1.1
-    return 1.0
+    return _DIFFICULTY_FACTORS.get(difficulty, 1.0)
+
+
+# ------------------------------------------------------------
+# Structure-of-arrays view of the library, built once at import.
+# The per-request ranking loop used to walk the list of dicts doing
+# .get/.lower()/set construction per workout; everything static is now
+# packed into parallel numpy arrays so scoring is pure vector math.
+# ------------------------------------------------------------
+
+_CATEGORIES = ("energizing", "balanced", "restorative")
+
+def _build_soa(library: List[Dict[str, Any]]):
+    n = len(library)
+    cat_ids = np.full(n, -1, dtype=np.int8)
+    diff = np.empty(n, dtype=float)
+    dur = np.empty(n, dtype=float)
+    target_masks = np.zeros(n, dtype=np.uint64)
+    target_bits: Dict[str, int] = {}
+
+    for i, w in enumerate(library):
+        cat = (w.get("category") or "").lower()
+        if cat in _CATEGORIES:
+            cat_ids[i] = _CATEGORIES.index(cat)
+        diff[i] = _difficulty_factor(w.get("difficulty", "medium"))
+        dur[i] = w.get("duration_min", 0)
+        mask = 0
+        for t in (w.get("targets") or []):
+            t = t.lower()
+            if t not in target_bits:
+                target_bits[t] = len(target_bits)
+            mask |= 1 << target_bits[t]
+        target_masks[i] = mask
+
+    return cat_ids, diff, dur, target_masks, target_bits
+
+_CAT_IDS, _DIFF, _DUR, _TARGET_MASKS, _TARGET_BITS = _build_soa(WORKOUT_LIBRARY)
+
+# Static part of each recommendation dict, normalized once at import;
+# per request only the two score-dependent fields are added on a copy.
+_RESULT_TEMPLATES = [
+    {
+        "id": w.get("id"),
+        "title": w.get("title"),
+        "category": w.get("category"),
+        "difficulty": w.get("difficulty"),
+        "duration_min": w.get("duration_min"),
+        "equipment": w.get("equipment", []),
+        "targets": w.get("targets", []),
+        "steps": w.get("steps", []),
+        "notes": w.get("notes", "") if isinstance(w.get("notes", ""), str) else ""
+    }
+    for w in WORKOUT_LIBRARY
+]
+
 
 def personalize_and_rank(
     fatigue_score: float,
@@ -52,7 +114,11 @@ def personalize_and_rank(
     """
     Returns top_k workout recommendations (structured) based on simple rules.
     """
+    if not WORKOUT_LIBRARY:
+        return []
+
     base_category = _category_for_fatigue(fatigue_score)
+    base_cat_id = _CATEGORIES.index(base_category)
     intensity_factor = 1.0
 
     # BMI adjustments
@@ -87,55 +153,37 @@ def personalize_and_rank(
     if medical_conditions:
         intensity_factor *= 0.6
 
-    banned = set([i.lower() for i in (injuries or [])])
-
-    scored: List[Tuple[float, Dict[str, Any]]] = []
-    for w in WORKOUT_LIBRARY:
-        w_cat = (w.get("category") or "").lower()
-        # discard workouts that explicitly target injured parts
-        targets = set([t.lower() for t in (w.get("targets") or [])])
-        if banned & targets:
-            continue
-
-        # base score: prefer workouts that match category
-        score = 1.0
-        if w_cat == base_category:
-            score *= 1.2
-        else:
-            # small preference to balanced if medium fatigue
-            if base_category == "balanced" and w_cat == "balanced":
-                score *= 1.05
-            else:
-                score *= 0.9
-
-        # difficulty factor
-        score *= _difficulty_factor(w.get("difficulty", "medium"))
-
-        # scale by intensity factor (user-specific)
-        score *= intensity_factor
-
-        # small boost for shorter workouts when fatigue is high
-        if base_category == "restorative" and w.get("duration_min", 0) > 15:
-            score *= 0.9
-
-        scored.append((score, w))
-
-    # sort and pick top_k
-    scored.sort(key=lambda x: x[0], reverse=True)
+    # Vectorized scoring: category preference x difficulty x user intensity
+    scores = np.where(_CAT_IDS == base_cat_id, 1.2, 0.9) * _DIFF * intensity_factor
+
+    # small boost for shorter workouts when fatigue is high
+    if base_category == "restorative":
+        scores = scores * np.where(_DUR > 15, 0.9, 1.0)
+
+    # discard workouts that explicitly target injured parts
+    banned_bits = 0
+    for inj in (injuries or []):
+        bit = _TARGET_BITS.get(inj.lower())
+        if bit is not None:
+            banned_bits |= 1 << bit
+    valid = (_TARGET_MASKS & np.uint64(banned_bits)) == 0
+
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return []
+
+    # stable full sort so tied scores keep first-in-library order, also
+    # at the top_k boundary (argpartition would pick an arbitrary
+    # survivor among boundary ties; with a library this small the O(N)
+    # saving is noise anyway)
+    top = idx[np.argsort(-scores[idx], kind="stable")][:top_k]
+
     results: List[Dict[str, Any]] = []
-    for score, w in scored[: top_k]:
-        scaled_duration = max(3, int(round(w.get("duration_min", 10) * score)))
-        results.append({
-            "id": w.get("id"),
-            "title": w.get("title"),
-            "category": w.get("category"),
-            "difficulty": w.get("difficulty"),
-            "duration_min": w.get("duration_min"),
-            "scaled_duration_min": scaled_duration,
-            "intensity_score": round(float(score), 2),
-            "equipment": w.get("equipment", []),
-            "targets": w.get("targets", []),
-            "steps": w.get("steps", []),
-            "notes": w.get("notes", "") if isinstance(w.get("notes", ""), str) else ""
-        })
+    for i in top:
+        score = float(scores[i])
+        result = dict(_RESULT_TEMPLATES[i])
+        duration = result["duration_min"] if result["duration_min"] is not None else 10
+        result["scaled_duration_min"] = max(3, int(round(duration * score)))
+        result["intensity_score"] = round(score, 2)
+        results.append(result)
     return results
@@ -12,6 +12,11 @@ import hashlib
 from datetime import datetime, timezone
 import joblib
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def safe_imports():
     try:
         import pandas as pd
@@ -82,12 +87,18 @@ def prepare_xy(df):
         raise ValueError("CSV must contain 'label' column")
     y = df["label"].astype(int)
     X = df.drop(columns=["label"])
+    # Coerce object columns without a Python-level apply per cell:
+    # to_numeric(errors="coerce") converts the numeric entries in one
+    # vectorized pass, then only the non-numeric remainder gets hashed.
     for c in X.columns:
-        if X[c].dtype == object:
-            try:
-                X[c] = pd.to_numeric(X[c])
-            except Exception:
-                X[c] = X[c].apply(lambda v: hash(str(v)) % 1000)
+        if X[c].dtype != object:
+            continue
+        numeric = pd.to_numeric(X[c], errors="coerce")
+        mask = numeric.isna()
+        if mask.any():
+            hashed = pd.util.hash_array(X[c][mask].astype(str).to_numpy()) % 1000
+            numeric[mask] = hashed.astype(float)
+        X[c] = numeric
     print("Prepared X shape:", X.shape, "y shape:", y.shape)
     return X.values, y.values, list(X.columns)
 
@@ -105,7 +116,9 @@ def main():
         )
         print("Train size:", len(y_train), "Val size:", len(y_val))
 
-        clf = RandomForestClassifier(n_estimators=100, random_state=42)
+        # n_jobs=-1: trees are independent, so fit parallelizes across
+        # all cores for free (random_state keeps results reproducible)
+        clf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
         print("Fitting classifier...")
         clf.fit(X_train, y_train)
         print("Fit complete.")
@@ -144,8 +157,12 @@ def main():
             "notes": "RandomForestClassifier trained on NeuroFit+ session data"
         }
         
-        with open(MANIFEST_PATH, "w") as f:
-            json.dump(manifest, f, indent=2)
+        if orjson is not None:
+            with open(MANIFEST_PATH, "wb") as f:
+                f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        else:
+            with open(MANIFEST_PATH, "w") as f:
+                json.dump(manifest, f, indent=2)
         print(f"Saved manifest to: {MANIFEST_PATH}")
     except Exception as e:
         print("Unhandled exception during training:", e)
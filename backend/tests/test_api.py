@@ -7,9 +7,12 @@ from app.main import app
 # Model path relative to backend directory
 MODEL_PATH = Path(__file__).parent.parent / "models" / "fatigue_model.pkl"
 
-@pytest.fixture(scope="module")
+# session scope: one TestClient (and one app lifespan, i.e. one model
+# load) shared across the whole run instead of per module
+@pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    with TestClient(app) as c:
+        yield c
 
 def _model_exists():
     return os.path.exists(MODEL_PATH)
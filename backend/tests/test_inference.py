@@ -0,0 +1,82 @@
+import asyncio
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.batching import MicroBatcher
+from app.fast_forest import FlatForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(300, 8))
+    y = rng.normal(size=300)
+    model = RandomForestRegressor(n_estimators=20, random_state=42)
+    model.fit(X, y)
+    return model
+
+
+def test_flat_forest_matches_sklearn_predict(forest):
+    """FlatForest must reproduce model.predict exactly, row by row"""
+    flat = FlatForest.from_estimator(forest)
+    assert flat is not None
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(100, 8))
+    expected = forest.predict(X)
+    for row, want in zip(X, expected):
+        assert flat.predict_one(row.tolist()) == want
+
+
+def test_flat_forest_rejects_unsupported_models():
+    """Non-forest models fall back to None (caller uses model.predict)"""
+    from sklearn.dummy import DummyRegressor
+    model = DummyRegressor().fit([[0.0] * 8], [0.5])
+    assert FlatForest.from_estimator(model) is None
+
+
+def test_micro_batcher_fans_out_concurrent_predictions():
+    """Concurrent callers each get the prediction for their own row"""
+    batch_sizes = []
+
+    def predict(X):
+        batch_sizes.append(len(X))
+        return X[:, 0] * 2.0
+
+    rows = [np.full(8, float(i)) for i in range(10)]
+
+    async def run():
+        batcher = MicroBatcher(predict, max_batch=16, max_wait_ms=5)
+        tasks = [asyncio.ensure_future(batcher.predict_one(r)) for r in rows]
+        # let every row enqueue before the worker starts, so the rows
+        # are actually batched rather than drained one by one
+        await asyncio.sleep(0)
+        batcher.start()
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            await batcher.stop()
+
+    preds = asyncio.run(run())
+    assert preds == [float(i) * 2.0 for i in range(10)]
+    # every row predicted exactly once, and at least one real batch
+    assert sum(batch_sizes) == 10
+    assert max(batch_sizes) > 1
+
+
+def test_micro_batcher_propagates_predict_errors():
+    """A failing predict_fn must reject the waiting callers, not hang"""
+    def predict(X):
+        raise RuntimeError("boom")
+
+    async def run():
+        batcher = MicroBatcher(predict, max_batch=4, max_wait_ms=1)
+        batcher.start()
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.predict_one(np.zeros(8))
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
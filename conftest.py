@@ -20,15 +20,21 @@ if str(BACKEND) not in sys.path:
 tmp_models = Path(tempfile.mkdtemp(prefix="neurofit_models_"))
 os.environ.setdefault("NEUROFIT_MODEL_DIR", str(tmp_models))
 
-_original_mkdir = pathlib.Path.mkdir
-def _safe_mkdir(self, parents=False, exist_ok=False):
-    try:
-        if str(self).startswith("/app"):
+# Only shim when a /app tree actually exists (read-only CI images);
+# everywhere else Path.mkdir stays untouched. *args/**kwargs keeps the
+# full mkdir signature — the old (parents, exist_ok) shim silently
+# dropped the positional mode argument, breaking callers such as
+# pytest's cacheprovider.
+if os.path.exists("/app"):
+    _original_mkdir = pathlib.Path.mkdir
+    def _safe_mkdir(self, *args, **kwargs):
+        if self.__fspath__().startswith("/app"):
+            return None
+        try:
+            return _original_mkdir(self, *args, **kwargs)
+        except PermissionError:
             return None
-        return _original_mkdir(self, parents=parents, exist_ok=exist_ok)
-    except PermissionError:
-        return None
-pathlib.Path.mkdir = _safe_mkdir
+    pathlib.Path.mkdir = _safe_mkdir
 
 def make_compat_testclient(OriginalClient):
     class CompatTestClient(OriginalClient):
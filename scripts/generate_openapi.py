@@ -1,5 +1,7 @@
 # File: scripts/generate_openapi.py
-import json, sys, os
+import sys, os
+
+import orjson
 
 # allow importing backend package
 sys.path.insert(0, os.getcwd())
@@ -15,8 +17,9 @@ spec = app.openapi()
 
 os.makedirs("docs", exist_ok=True)
 
-with open("docs/openapi.json", "w", encoding="utf-8") as f:
-    json.dump(spec, f, indent=2)
+# orjson serializes the multi-MB spec in one shot, written as a single
+# bytes blob (the app itself depends on orjson, so no fallback needed)
+with open("docs/openapi.json", "wb") as f:
+    f.write(orjson.dumps(spec, option=orjson.OPT_INDENT_2))
 
 print("Wrote docs/openapi.json")
-
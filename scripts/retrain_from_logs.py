@@ -12,8 +12,17 @@ Writes:
 import json
 from pathlib import Path
 import numpy as np
+
+# orjson parses the JSONL log ~3x faster than stdlib json and takes
+# bytes directly; fall back to stdlib when it isn't installed.
+try:
+    import orjson
+    from orjson import loads as json_loads
+except ImportError:
+    orjson = None
+    from json import loads as json_loads
 import joblib
-from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
 
@@ -36,30 +45,59 @@ def load_dataset():
     if not LOG_FILE.exists():
         raise RuntimeError("No prediction log found. Cannot retrain.")
 
-    X, y = [], []
-
-    with open(LOG_FILE, "r") as f:
+    # Fill preallocated blocks instead of growing Python lists: rows go
+    # straight into float64 arrays, so there is no list-of-lists
+    # intermediate to copy (and re-typecheck) at the end.
+    block_rows = 65536
+    n_features = len(FEATURE_ORDER)
+    x_blocks, y_blocks = [], []
+    xb = np.empty((block_rows, n_features))
+    yb = np.empty(block_rows)
+    i = 0
+
+    # bind hot names as locals: LOAD_FAST beats LOAD_GLOBAL/LOAD_METHOD
+    # in this interpreter-bound loop
+    loads = json_loads
+
+    # binary mode: orjson accepts the raw line bytes, skipping a
+    # per-line UTF-8 decode
+    with open(LOG_FILE, "rb") as f:
         for line in f:
             try:
-                row = json.loads(line)
+                row = loads(line)
                 features = row.get("features")
                 score = row.get("fatigue_score")
 
                 if features is None or score is None:
                     continue
 
-                if len(features) != len(FEATURE_ORDER):
+                if len(features) != n_features:
                     continue
 
-                X.append(features)
-                y.append(score)
-            except Exception:
+                xb[i] = features
+                yb[i] = score
+                i += 1
+            except (ValueError, TypeError, AttributeError):
+                # malformed JSON or a non-object line; anything else
+                # should surface rather than be silently dropped
                 continue
 
+            if i == block_rows:
+                x_blocks.append(xb)
+                y_blocks.append(yb)
+                xb = np.empty((block_rows, n_features))
+                yb = np.empty(block_rows)
+                i = 0
+
+    x_blocks.append(xb[:i])
+    y_blocks.append(yb[:i])
+    X = np.concatenate(x_blocks) if len(x_blocks) > 1 else x_blocks[0]
+    y = np.concatenate(y_blocks) if len(y_blocks) > 1 else y_blocks[0]
+
     if len(X) < 20:
         raise RuntimeError("Not enough data to retrain (need at least ~20 samples)")
 
-    return np.array(X, dtype=float), np.array(y, dtype=float)
+    return X, y
 
 def main():
     print("Loading dataset from logs...")
@@ -70,8 +108,10 @@ def main():
         X, y, test_size=0.2, random_state=42
     )
 
-    model = GradientBoostingRegressor(
-        n_estimators=150,
+    # histogram-based boosting trains orders of magnitude faster than
+    # the exact-split GradientBoostingRegressor at comparable accuracy
+    model = HistGradientBoostingRegressor(
+        max_iter=150,
         learning_rate=0.08,
         max_depth=4,
         random_state=42
@@ -84,18 +124,26 @@ def main():
     mse = mean_squared_error(y_test, preds)
     r2 = r2_score(y_test, preds)
 
-    joblib.dump(model, MODEL_DIR / "ml_model.joblib")
+    # Uncompressed on purpose: the API loads this with mmap_mode="r".
+    joblib.dump(model, MODEL_DIR / "ml_model.joblib", compress=0)
 
     metadata = {
         "trained_from": "predictions.log",
         "samples": int(len(X)),
         "mse": mse,
         "r2": r2,
-        "model_type": "GradientBoostingRegressor"
+        "model_type": "HistGradientBoostingRegressor"
     }
 
-    with open(MODEL_DIR / "model_metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2)
+    meta_file = MODEL_DIR / "model_metadata.json"
+    if orjson is not None:
+        # OPT_SERIALIZE_NUMPY handles the numpy scalars in the metrics
+        meta_file.write_bytes(
+            orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        with open(meta_file, "w") as f:
+            json.dump(metadata, f, indent=2)
 
     print("✅ Retraining complete")
     print(json.dumps(metadata, indent=2))
@@ -15,8 +15,13 @@ import argparse
 import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # sklearn
-from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score, roc_auc_score
 import joblib
@@ -32,79 +37,73 @@ FEATURE_ORDER = [
     "reaction_attempted",
 ]
 
-def clamp(a, lo, hi):
-    return max(lo, min(hi, a))
-
-def generate_sample(rng):
+def generate_samples(rng, n):
     """
-    Generate one synthetic session sample.
-    Returns dict matching features.
+    Generate n synthetic session samples as a dict of feature arrays.
+    All rows are drawn in one shot per feature; NumPy ufuncs do the
+    arithmetic instead of a Python loop over samples.
     """
     # sleep: typical 4-9 with tails
-    sleep = clamp(rng.normal(6.5, 1.6), 0.0, 12.0)
+    sleep = np.clip(rng.normal(6.5, 1.6, size=n), 0.0, 12.0)
 
     # energy correlates with sleep + noise
-    energy = clamp( (sleep / 12.0) * 10.0 + rng.normal(0,1.2), 0.0, 10.0 )
+    energy = np.clip((sleep / 12.0) * 10.0 + rng.normal(0, 1.2, size=n), 0.0, 10.0)
 
     # stress inversely correlated with sleep and energy
-    stress = clamp( max(0.0, 10.0 - (sleep/12.0)*8.0 + rng.normal(0,1.8)), 0.0, 10.0 )
+    stress = np.clip(10.0 - (sleep / 12.0) * 8.0 + rng.normal(0, 1.8, size=n), 0.0, 10.0)
 
     # typing latency: better (lower) when rested, but with noise
-    avg_latency = clamp( rng.normal(150 + (7.5 - sleep)*15, 40), 20, 2000 )  # ms
+    avg_latency = np.clip(rng.normal(150 + (7.5 - sleep) * 15, 40), 20, 2000)  # ms
 
     # total typing duration (ms) roughly related to task complexity
-    total_dur = clamp( rng.normal(2000 + rng.normal(0,600), 500), 200, 20000 )
+    total_dur = np.clip(rng.normal(2000 + rng.normal(0, 600, size=n), 500), 200, 20000)
 
     # backspace rate: small fraction
-    backspace_rate = clamp( rng.beta(1.2, 30.0) , 0.0, 1.0 )
+    backspace_rate = np.clip(rng.beta(1.2, 30.0, size=n), 0.0, 1.0)
 
     # reaction time: slower when fatigued / stressed
-    reaction_time = clamp( rng.normal(300 + (7.0 - sleep)*35 + stress*8, 80), 100, 3000 )
+    reaction_time = np.clip(rng.normal(300 + (7.0 - sleep) * 35 + stress * 8, 80), 100, 3000)
 
     # reaction attempted: sometimes user didn't do the test
-    reaction_attempted = bool(rng.random() > 0.08)
+    attempted = rng.random(n) > 0.08
 
-    # Construct sample
     return {
-        "sleep_hours": float(sleep),
-        "energy_level": float(energy),
-        "stress_level": float(stress),
-        "avg_key_latency_ms": float(avg_latency),
-        "total_duration_ms": float(total_dur),
-        "backspace_rate": float(backspace_rate),
-        "reaction_time_ms": float(reaction_time) if reaction_attempted else 0.0,
-        "reaction_attempted": 1.0 if reaction_attempted else 0.0,
+        "sleep_hours": sleep,
+        "energy_level": energy,
+        "stress_level": stress,
+        "avg_key_latency_ms": avg_latency,
+        "total_duration_ms": total_dur,
+        "backspace_rate": backspace_rate,
+        "reaction_time_ms": np.where(attempted, reaction_time, 0.0),
+        "reaction_attempted": attempted.astype(float),
     }
 
-def compute_ground_truth(sample):
+def compute_ground_truth(samples, rng):
     """
-    Create a continuous fatigue score in [0,1].
+    Create continuous fatigue scores in [0,1], one per row.
     Heuristic combining features — used as 'label' for synthetic training.
     Lower sleep, higher stress, slower typing & reaction => higher fatigue.
     """
     # Normalize / scale terms to roughly comparable ranges
-    sleep_term = 1.0 - (sample["sleep_hours"] / 9.0)          # 0 when 9h, >0 when less
-    stress_term = sample["stress_level"] / 10.0              # 0..1
-    latency_term = sample["avg_key_latency_ms"] / 1000.0     # e.g., 0.15 for 150ms
-    reaction_term = (sample["reaction_time_ms"] / 2000.0) if sample["reaction_attempted"] else 0.7
+    sleep_term = 1.0 - samples["sleep_hours"] / 9.0          # 0 when 9h, >0 when less
+    stress_term = samples["stress_level"] / 10.0             # 0..1
+    latency_term = samples["avg_key_latency_ms"] / 1000.0    # e.g., 0.15 for 150ms
+    attempted = samples["reaction_attempted"] > 0
+    reaction_term = np.where(attempted, samples["reaction_time_ms"] / 2000.0, 0.7)
 
     # Weighted sum (these weights define how the synthetic label behaves)
     score = 0.55 * sleep_term + 0.25 * stress_term + 0.12 * latency_term + 0.08 * reaction_term
 
     # add a bit of noise and clamp
-    score = score + np.random.normal(0, 0.03)
-    score = float(max(0.0, min(1.0, score)))
-    return score
+    score = score + rng.normal(0, 0.03, size=len(score))
+    return np.clip(score, 0.0, 1.0)
 
 def build_dataset(n=2000, seed=42):
     rng = np.random.default_rng(seed)
-    rows = []
-    for _ in range(n):
-        s = generate_sample(rng)
-        label = compute_ground_truth(s)
-        s["fatigue_score"] = label
-        rows.append(s)
-    df = pd.DataFrame(rows)
+    samples = generate_samples(rng, n)
+    samples["fatigue_score"] = compute_ground_truth(samples, rng)
+    # dict-of-arrays: one column-wise DataFrame allocation, no per-row dicts
+    df = pd.DataFrame(samples, copy=False)
     return df
 
 def train_and_save(df, out_dir: Path, random_seed=42):
@@ -113,8 +112,10 @@ def train_and_save(df, out_dir: Path, random_seed=42):
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.18, random_state=random_seed)
 
-    # regressor baseline
-    model = GradientBoostingRegressor(n_estimators=150, learning_rate=0.08, max_depth=4, random_state=random_seed)
+    # regressor baseline: histogram-based boosting trains orders of
+    # magnitude faster than the exact-split GradientBoostingRegressor
+    # at comparable accuracy
+    model = HistGradientBoostingRegressor(max_iter=150, learning_rate=0.08, max_depth=4, random_state=random_seed)
 
     model.fit(X_train, y_train)
 
@@ -132,19 +133,27 @@ def train_and_save(df, out_dir: Path, random_seed=42):
     # save model + metadata
     out_dir.mkdir(parents=True, exist_ok=True)
     model_file = out_dir / "ml_model.joblib"
-    joblib.dump(model, model_file)
+    # Uncompressed on purpose: the API loads this with mmap_mode="r".
+    joblib.dump(model, model_file, compress=0)
 
     meta = {
         "feature_order": FEATURE_ORDER,
-        "model_type": "GradientBoostingRegressor",
+        "model_type": "HistGradientBoostingRegressor",
         "n_features": len(FEATURE_ORDER),
         "mse": mse,
         "r2": r2,
         "auc_at_0.5": auc,
         "notes": "Synthetic-data baseline. Replace with real data and retrain for production."
     }
-    with open(out_dir / "model_metadata.json", "w") as f:
-        json.dump(meta, f, indent=2)
+    meta_file = out_dir / "model_metadata.json"
+    if orjson is not None:
+        # OPT_SERIALIZE_NUMPY handles the numpy scalars in the metrics
+        meta_file.write_bytes(
+            orjson.dumps(meta, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        )
+    else:
+        with open(meta_file, "w") as f:
+            json.dump(meta, f, indent=2)
 
     return model_file, meta
 
@@ -5,19 +5,25 @@
 
 import importlib
 import inspect
+import os
 import pathlib
 from pathlib import Path
 
-# 1) defensive mkdir shim for read-only /app (redundant if conftest also has it)
-_original_mkdir = pathlib.Path.mkdir
-def _safe_mkdir(self, parents=False, exist_ok=False):
-    try:
-        if str(self).startswith("/app"):
+# 1) defensive mkdir shim for read-only /app (redundant if conftest also has it).
+# Installed only when a /app tree exists, so normal environments keep the
+# untouched Path.mkdir. *args/**kwargs preserves the full signature — the
+# old (parents, exist_ok) shim silently dropped the positional mode
+# argument, breaking callers such as pytest's cacheprovider.
+if os.path.exists("/app"):
+    _original_mkdir = pathlib.Path.mkdir
+    def _safe_mkdir(self, *args, **kwargs):
+        if self.__fspath__().startswith("/app"):
+            return None
+        try:
+            return _original_mkdir(self, *args, **kwargs)
+        except PermissionError:
             return None
-        return _original_mkdir(self, parents=parents, exist_ok=exist_ok)
-    except PermissionError:
-        return None
-pathlib.Path.mkdir = _safe_mkdir
+    pathlib.Path.mkdir = _safe_mkdir
 
 # 2) patch the concrete httpx client __init__ to remove 'app' kw if present
 try:
@@ -43,6 +43,15 @@ def find_workout_fn(mod: ModuleType):
     )
 
 
+# session scope: the module import and POSSIBLE_FNAMES scan run once for
+# the whole suite instead of per test (a skip here skips each user test,
+# exactly as the per-test lookup did)
+@pytest.fixture(scope="session")
+def workout_fn():
+    mod = load_module()
+    return find_workout_fn(mod)
+
+
 @pytest.fixture
 def sample_profile():
     return {
@@ -56,9 +65,8 @@ def sample_profile():
     }
 
 
-def test_workout_fn_exists_and_returns_list(sample_profile):
-    mod = load_module()
-    fn = find_workout_fn(mod)
+def test_workout_fn_exists_and_returns_list(workout_fn, sample_profile):
+    fn = workout_fn
 
     # call with a mid-range fatigue score
     out = fn(sample_profile, 0.5) if fn.__code__.co_argcount >= 2 else fn(sample_profile)
@@ -78,9 +86,8 @@ def test_workout_fn_exists_and_returns_list(sample_profile):
             "Workout dict should contain at least one of: title, name, description, exercises"
 
 
-def test_workout_variation_with_fatigue(sample_profile):
-    mod = load_module()
-    fn = find_workout_fn(mod)
+def test_workout_variation_with_fatigue(workout_fn, sample_profile):
+    fn = workout_fn
 
     # call with low fatigue (energetic) and high fatigue (tired)
     try:
@@ -102,9 +109,8 @@ def test_workout_variation_with_fatigue(sample_profile):
         assert low_s != high_s, "Workouts did not change between low and high fatigue inputs"
 
 
-def test_handles_injury_filtering(sample_profile):
-    mod = load_module()
-    fn = find_workout_fn(mod)
+def test_handles_injury_filtering(workout_fn, sample_profile):
+    fn = workout_fn
 
     profile_no_injury = sample_profile.copy()
     profile_knee = sample_profile.copy()